@@ -1,7 +1,7 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 
 # Page configuration with custom theme
 st.set_page_config(
@@ -12,70 +12,102 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling (works in both light and dark mode)
-st.markdown("""
-    <style>
-    /* Metric styling that works in both themes */
-    [data-testid="stMetricValue"] {
-        font-size: 1.8rem;
-        font-weight: 600;
-    }
-    
-    [data-testid="stMetricLabel"] {
-        font-size: 0.95rem;
-        font-weight: 500;
-    }
-    
-    [data-testid="stMetricDelta"] {
-        font-size: 0.85rem;
-    }
-    
-    /* Ensure metrics are visible in dark mode */
-    [data-testid="metric-container"] {
-        background-color: var(--background-color);
-        padding: 15px;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        border: 1px solid rgba(128, 128, 128, 0.2);
-    }
-    
-    /* Light mode specific */
-    @media (prefers-color-scheme: light) {
-        .main {
-            background-color: #f5f7fa;
-        }
-        h1 {
-            color: #1f4788;
-            font-weight: 700;
-        }
-        h2 {
-            color: #2c5aa0;
-            font-weight: 600;
-        }
-        h3 {
-            color: #3d6ab3;
-        }
-    }
-    
-    /* Dark mode specific */
-    @media (prefers-color-scheme: dark) {
-        [data-testid="metric-container"] {
-            background-color: rgba(255, 255, 255, 0.05);
-            border: 1px solid rgba(255, 255, 255, 0.1);
-        }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+@st.cache_data
+def load_css():
+    with open('style.css') as f:
+        return f.read()
+
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+
+subject_cols = ['sql_marks', 'excel_marks', 'python_marks', 'power_bi_marks', 'english_marks']
 
 # Load the dataset
 @st.cache_data
 def load_data():
-    df = pd.read_csv('data_science_student_marks.csv')
-    # Calculate average marks and total marks
-    df['average_marks'] = df[['sql_marks', 'excel_marks', 'python_marks', 'power_bi_marks', 'english_marks']].mean(axis=1).round(2)
-    df['total_marks'] = df[['sql_marks', 'excel_marks', 'python_marks', 'power_bi_marks', 'english_marks']].sum(axis=1)
-    return df
+    # Columnar Parquet copy of data_science_student_marks.csv, with location stored
+    # as a categorical so groupbys work on integer codes
+    df = pd.read_parquet('data_science_student_marks.parquet', engine='pyarrow')
+    # Calculate total and average marks in a single pass over the raw marks array
+    marks = df[subject_cols].to_numpy(np.float32)
+    total = marks.sum(axis=1)
+    df['average_marks'] = np.round(total * (1 / len(subject_cols)), 2)
+    df['total_marks'] = total.astype(np.int16)  # at most 5 * 100 = 500
+    # Marks (0-100) and ages fit in int8
+    df[subject_cols] = df[subject_cols].astype(np.int8)
+    df['age'] = df['age'].astype(np.int8)
+    # Sidebar filter options, computed once with the data
+    all_locations = ['All'] + df['location'].cat.categories.tolist()
+    min_age = int(df['age'].min())
+    max_age = int(df['age'].max())
+    return df, all_locations, min_age, max_age
+
+# Keep the loaded data in session state so reruns reuse it instead of copying it out of the cache
+if 'data' not in st.session_state:
+    st.session_state.data = load_data()
+df, all_locations, min_age, max_age = st.session_state.data
+
+# Cached filtering (the leading underscore skips hashing the base frame, so results
+# are keyed on the filter widget values only and shared across sessions)
+@st.cache_data
+def apply_filters(_df, location, age_lo, age_hi, min_avg):
+    # Combine all conditions into one boolean mask over the raw arrays
+    ages = _df['age'].values
+    mask = (ages >= age_lo) & (ages <= age_hi)
+    mask &= _df['average_marks'].values >= min_avg
+
+    if location != 'All':
+        mask &= _df['location'].values == location
+
+    return _df[mask]
 
-df = load_data()
+# Cached aggregations over the filtered data (the leading underscore skips hashing
+# the frame itself, so these are keyed on the filter values only)
+@st.cache_data
+def location_subject_means(_filtered_df, filters):
+    # One groupby feeds both the location bar chart and the heatmap
+    return _filtered_df.groupby('location', observed=True)[subject_cols].mean()
+
+@st.cache_data
+def subject_stats(_filtered_df, filters):
+    stats_df = _filtered_df[subject_cols].describe().round(2)
+    stats_df.columns = ['SQL', 'Excel', 'Python', 'Power BI', 'English']
+    return stats_df
+
+@st.cache_data
+def location_distribution(_filtered_df, filters):
+    # Observed locations in order of first appearance, then a stable sort by count,
+    # so ties keep the same order as value_counts on plain strings
+    locations = _filtered_df['location']
+    location_counts = locations.value_counts(sort=False)[locations.unique()]
+    location_counts = location_counts.sort_values(ascending=False, kind='stable').reset_index()
+    location_counts.columns = ['Location', 'Count']
+    location_counts['Location'] = location_counts['Location'].astype(str)
+    return location_counts
+
+@st.cache_data
+def age_distribution(_filtered_df, filters):
+    age_counts = _filtered_df['age'].value_counts().sort_index().reset_index()
+    age_counts.columns = ['Age', 'Count']
+    return age_counts
+
+@st.cache_data
+def top10(_filtered_df, filters):
+    # Partition out the k-th largest score in O(n), then sort only the top k rows.
+    # Ties at the cutoff keep the earliest rows, matching DataFrame.nlargest.
+    avg_marks = _filtered_df['average_marks'].to_numpy()
+    k = min(10, len(avg_marks))
+    cutoff = np.partition(avg_marks, -k)[-k]
+    above = np.flatnonzero(avg_marks > cutoff)
+    ties = np.flatnonzero(avg_marks == cutoff)[:k - len(above)]
+    idx = np.concatenate([above, ties])
+    idx = idx[np.argsort(-avg_marks[idx], kind='stable')]
+    return _filtered_df.iloc[idx][
+        ['student_id', 'location', 'age', 'average_marks', 'total_marks']
+    ].reset_index(drop=True)
+
+@st.cache_data
+def to_csv_bytes(_filtered_df, filters):
+    return _filtered_df.to_csv(index=False).encode()
 
 # Title and description
 st.title("📊 Data Science Student Marks Dashboard")
@@ -87,7 +119,6 @@ st.sidebar.header("🔍 Filters")
 st.sidebar.markdown("Use the filters below to customize your view")
 
 # Filter 1: Location filter
-all_locations = ['All'] + sorted(df['location'].unique().tolist())
 selected_location = st.sidebar.selectbox(
     "Select Location:",
     options=all_locations,
@@ -95,8 +126,6 @@ selected_location = st.sidebar.selectbox(
 )
 
 # Filter 2: Age range slider
-min_age = int(df['age'].min())
-max_age = int(df['age'].max())
 age_range = st.sidebar.slider(
     "Select Age Range:",
     min_value=min_age,
@@ -125,18 +154,27 @@ st.sidebar.markdown("---")
 st.sidebar.info("💡 **Tip:** Use the filters to drill down into specific student segments!")
 
 # Apply filters
-filtered_df = df.copy()
-
-if selected_location != 'All':
-    filtered_df = filtered_df[filtered_df['location'] == selected_location]
-
-filtered_df = filtered_df[(filtered_df['age'] >= age_range[0]) & (filtered_df['age'] <= age_range[1])]
-filtered_df = filtered_df[filtered_df['average_marks'] >= min_avg]
+filters = (selected_location, age_range[0], age_range[1], min_avg)
+if selected_location == 'All' and age_range == (min_age, max_age) and min_avg == 0:
+    # Default filters keep every row, so skip the mask and use the base frame as is
+    filtered_df = df
+else:
+    filtered_df = apply_filters(df, *filters)
 
 # Main dashboard
 if len(filtered_df) == 0:
     st.warning("⚠️ No data matches the selected filters. Please adjust your filter criteria.")
 else:
+    # Per-location subject averages shared by the metrics, bar chart and heatmap
+    location_means = location_subject_means(filtered_df, filters)
+    
+    # Raw column views for the key metric reductions
+    ages = filtered_df['age'].values
+    avg_marks = filtered_df['average_marks'].values
+    age_mean = ages.mean()
+    avg_mean = avg_marks.mean()
+    avg_max = avg_marks.max()
+    
     # Key Metrics Section
     st.header("📈 Key Metrics")
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -151,28 +189,28 @@ else:
     with col2:
         st.metric(
             label="Average Age",
-            value=f"{filtered_df['age'].mean():.1f}",
+            value=f"{age_mean:.1f}",
             delta=None
         )
     
     with col3:
         st.metric(
             label="Avg Overall Score",
-            value=f"{filtered_df['average_marks'].mean():.2f}",
+            value=f"{avg_mean:.2f}",
             delta=None
         )
     
     with col4:
         st.metric(
             label="Top Score",
-            value=f"{filtered_df['average_marks'].max():.2f}",
+            value=f"{avg_max:.2f}",
             delta=None
         )
     
     with col5:
         st.metric(
             label="Locations",
-            value=filtered_df['location'].nunique(),
+            value=len(location_means),
             delta=None
         )
     
@@ -187,10 +225,10 @@ else:
     # Visualization 1: Average Marks by Location (Bar Chart)
     with viz_col1:
         st.subheader("Average Marks by Location")
-        location_avg = filtered_df.groupby('location')['average_marks'].mean().sort_values(ascending=False).reset_index()
+        location_avg_df = location_means.mean(axis=1).sort_values(ascending=False).reset_index(name='average_marks')
         
         fig1 = px.bar(
-            location_avg,
+            location_avg_df,
             x='location',
             y='average_marks',
             color='average_marks',
@@ -209,8 +247,7 @@ else:
     with viz_col2:
         st.subheader("Subject Marks Distribution")
         
-        # Prepare data for box plot
-        subject_data = []
+        # Prepare data for box plot (long format via melt)
         subject_mapping = {
             'sql_marks': 'SQL',
             'excel_marks': 'Excel',
@@ -218,16 +255,11 @@ else:
             'power_bi_marks': 'Power BI',
             'english_marks': 'English'
         }
+        selected_cols = [col for col, name in subject_mapping.items() if name in selected_subjects]
         
-        for subject_col, subject_name in subject_mapping.items():
-            if subject_name in selected_subjects:
-                subject_data.extend([
-                    {'Subject': subject_name, 'Marks': mark} 
-                    for mark in filtered_df[subject_col]
-                ])
-        
-        if subject_data:
-            subject_df = pd.DataFrame(subject_data)
+        if selected_cols:
+            subject_df = filtered_df[selected_cols].melt(var_name='Subject', value_name='Marks')
+            subject_df['Subject'] = subject_df['Subject'].map(subject_mapping)
             fig2 = px.box(
                 subject_df,
                 x='Subject',
@@ -253,7 +285,8 @@ else:
         hover_data=['student_id'],
         title='Student Performance by Age and Location',
         labels={'age': 'Age', 'average_marks': 'Average Marks'},
-        color_discrete_sequence=px.colors.qualitative.Pastel
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        render_mode='webgl'
     )
     fig3.update_layout(height=450)
     st.plotly_chart(fig3, use_container_width=True)
@@ -262,24 +295,23 @@ else:
     st.subheader("Subject Performance Heatmap")
     
     # Calculate average marks for each subject by location
-    subject_cols = ['sql_marks', 'excel_marks', 'python_marks', 'power_bi_marks', 'english_marks']
-    heatmap_data = filtered_df.groupby('location')[subject_cols].mean().round(2)
+    heatmap_data = location_means.round(2)
     
-    fig4 = go.Figure(data=go.Heatmap(
-        z=heatmap_data.values,
+    # Per-cell labels only while the grid is small enough to stay readable and cheap to render
+    fig4 = px.imshow(
+        heatmap_data,
         x=['SQL', 'Excel', 'Python', 'Power BI', 'English'],
-        y=heatmap_data.index,
-        colorscale='RdYlGn',
-        text=heatmap_data.values,
-        texttemplate='%{text:.1f}',
-        textfont={"size": 10},
-        colorbar=dict(title="Avg Marks")
-    ))
+        color_continuous_scale='RdYlGn',
+        aspect='auto',
+        text_auto='.1f' if heatmap_data.size <= 60 else False,
+        labels={'x': 'Subject', 'y': 'Location', 'color': 'Avg Marks'}
+    )
+    fig4.update_traces(textfont_size=10)
+    # imshow puts the first row at the top; keep the first location at the bottom as before
+    fig4.update_yaxes(autorange=True)
     
     fig4.update_layout(
         title='Average Subject Marks by Location',
-        xaxis_title='Subject',
-        yaxis_title='Location',
         height=400
     )
     st.plotly_chart(fig4, use_container_width=True)
@@ -295,50 +327,32 @@ else:
         st.subheader("Statistical Summary")
         
         # Subject statistics
-        stats_df = filtered_df[subject_cols].describe().round(2)
-        stats_df.columns = ['SQL', 'Excel', 'Python', 'Power BI', 'English']
+        stats_df = subject_stats(filtered_df, filters)
         st.dataframe(stats_df, use_container_width=True)
         
         # Additional insights
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("**📍 Location Distribution**")
-            location_counts = filtered_df['location'].value_counts().reset_index()
-            location_counts.columns = ['Location', 'Count']
+            location_counts = location_distribution(filtered_df, filters)
             st.dataframe(location_counts, use_container_width=True, hide_index=True)
         
         with col2:
             st.markdown("**🎂 Age Distribution**")
-            age_counts = filtered_df['age'].value_counts().sort_index().reset_index()
-            age_counts.columns = ['Age', 'Count']
+            age_counts = age_distribution(filtered_df, filters)
             st.dataframe(age_counts, use_container_width=True, hide_index=True)
     
     with tab2:
         st.subheader("Top 10 Performers")
-        top_students = filtered_df.nlargest(10, 'average_marks')[
-            ['student_id', 'location', 'age', 'average_marks', 'total_marks']
-        ].reset_index(drop=True)
+        top_students = top10(filtered_df, filters)
         top_students.index = top_students.index + 1
         st.dataframe(top_students, use_container_width=True)
         
         st.markdown("**🏆 Best Subject Performance**")
-        best_subjects = pd.DataFrame({
-            'Subject': ['SQL', 'Excel', 'Python', 'Power BI', 'English'],
-            'Highest Score': [
-                filtered_df['sql_marks'].max(),
-                filtered_df['excel_marks'].max(),
-                filtered_df['python_marks'].max(),
-                filtered_df['power_bi_marks'].max(),
-                filtered_df['english_marks'].max()
-            ],
-            'Average Score': [
-                filtered_df['sql_marks'].mean().round(2),
-                filtered_df['excel_marks'].mean().round(2),
-                filtered_df['python_marks'].mean().round(2),
-                filtered_df['power_bi_marks'].mean().round(2),
-                filtered_df['english_marks'].mean().round(2)
-            ]
-        })
+        best_subjects = filtered_df[subject_cols].agg(['max', 'mean']).round(2).T.reset_index()
+        best_subjects.columns = ['Subject', 'Highest Score', 'Average Score']
+        best_subjects['Subject'] = ['SQL', 'Excel', 'Python', 'Power BI', 'English']
+        best_subjects['Highest Score'] = best_subjects['Highest Score'].astype(int)
         st.table(best_subjects)
     
     with tab3:
@@ -360,7 +374,7 @@ else:
                 st.dataframe(filtered_df[display_cols], use_container_width=True)
         
         # Download button
-        csv = filtered_df.to_csv(index=False)
+        csv = to_csv_bytes(filtered_df, filters)
         st.download_button(
             label="📥 Download Filtered Data as CSV",
             data=csv,